@@ -0,0 +1,181 @@
+"""
+Server-side response cache with HTTP revalidation for the Chained Form API
+
+ASGI middleware that keeps complete GET responses for configured read-heavy
+paths in memory, tags them with an ETag and Cache-Control, and answers
+matching If-None-Match requests with 304 Not Modified. Call
+`ResponseCache.invalidate()` whenever data behind those paths changes
+(new submissions); every cached entry is then recomputed on next use.
+"""
+
+import hashlib
+import multiprocessing
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class CachedResponse:
+    """A stored response body with the headers needed to replay it"""
+
+    def __init__(self, generation: int, status: int, headers: List[Tuple[bytes, bytes]],
+                 body: bytes, etag: str):
+        self.generation = generation
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.etag = etag
+
+
+class ResponseCache:
+    """
+    Bounded LRU of responses keyed by path and query string
+
+    Entries are validated against a generation counter kept in shared memory:
+    created before workers are forked (python main.py --workers N), it is
+    inherited by all of them, so a submission handled by one worker
+    invalidates the caches of every worker.
+    """
+
+    def __init__(self, max_entries: int = 256, max_body_size: int = 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_body_size = max_body_size
+        self._generation = multiprocessing.Value("Q", 0)
+        self._entries = OrderedDict()
+
+    @property
+    def generation(self) -> int:
+        return self._generation.value
+
+    def invalidate(self):
+        """Mark every cached response as stale"""
+        with self._generation.get_lock():
+            self._generation.value += 1
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.generation != self.generation:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: CachedResponse):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def make_etag(body: bytes) -> str:
+    # Weak, so the same validator holds for every Content-Encoding of the body
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored"""
+    if if_none_match.strip() == "*":
+        return True
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+    return any(opaque(tag) == opaque(etag) for tag in if_none_match.split(","))
+
+
+class CacheMiddleware:
+    """Serve GET requests for `paths` from `cache`, with ETag revalidation"""
+
+    def __init__(self, app: ASGIApp, cache: ResponseCache, paths: Iterable[str],
+                 cache_control: str = "no-cache"):
+        self.app = app
+        self.cache = cache
+        self.paths = frozenset(paths)
+        # "no-cache" lets clients store responses but makes them revalidate
+        # on every poll, which costs a 304 while nothing has changed
+        self.cache_control = cache_control
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        key = scope["path"]
+        if scope.get("query_string"):
+            key += "?" + scope["query_string"].decode("latin-1")
+        if_none_match = Headers(scope=scope).get("if-none-match")
+
+        entry = self.cache.get(key)
+        if entry is None:
+            # Note the generation first so a submission racing with the
+            # computation leaves the stored entry already stale
+            generation = self.cache.generation
+            entry = await self._compute(scope, receive, send, generation)
+            if entry is None:
+                # Response was streamed or not cacheable and has been sent
+                return
+            if entry.status == 200:
+                self.cache.put(key, entry)
+
+        if if_none_match and entry.status == 200 and etag_matches(if_none_match, entry.etag):
+            await send({"type": "http.response.start", "status": 304,
+                        "headers": self._validator_headers(entry)})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        headers = [(k, v) for k, v in entry.headers if k not in (b"etag", b"cache-control")]
+        if entry.status == 200:
+            headers += self._validator_headers(entry)
+        await send({"type": "http.response.start", "status": entry.status, "headers": headers})
+        await send({"type": "http.response.body", "body": entry.body})
+
+    def _validator_headers(self, entry: CachedResponse) -> List[Tuple[bytes, bytes]]:
+        return [(b"etag", entry.etag.encode("latin-1")),
+                (b"cache-control", self.cache_control.encode("latin-1"))]
+
+    async def _compute(self, scope: Scope, receive: Receive, send: Send,
+                       generation: int) -> Optional[CachedResponse]:
+        """
+        Run the endpoint and buffer its response
+
+        Returns None if the response turned out to be streamed or too large
+        to cache; in that case it has already been forwarded to `send`.
+        """
+        start: Message = {}
+        chunks = []
+        size = 0
+        forwarding = False
+
+        async def capture(message: Message):
+            nonlocal start, size, forwarding
+            if forwarding:
+                await send(message)
+            elif message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                body = message.get("body", b"")
+                more_body = message.get("more_body", False)
+                size += len(body)
+                if more_body or size > self.cache.max_body_size:
+                    # Don't hold streams (exports) in memory - forward as-is
+                    forwarding = True
+                    await send(start)
+                    for chunk in chunks:
+                        await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                    await send(message)
+                else:
+                    chunks.append(body)
+
+        await self.app(scope, receive, capture)
+        if forwarding:
+            return None
+
+        body = b"".join(chunks)
+        return CachedResponse(generation, start["status"], list(start.get("headers", [])),
+                              body, make_etag(body))
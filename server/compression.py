@@ -0,0 +1,215 @@
+"""
+Negotiated response compression for the Chained Form API
+
+ASGI middleware that compresses responses with zstd, brotli or gzip,
+whichever the client accepts and the server supports. Small responses
+are sent as-is, and streamed responses are compressed chunk by chunk.
+
+brotli and zstd are optional: if the `brotli` / `zstandard` packages
+are missing, those encodings are not offered and gzip is used instead.
+"""
+
+import zlib
+from typing import Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# Only text-like payloads are worth compressing
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript",
+                      "application/xml", "application/x-ndjson")
+
+
+class GzipCompressor:
+    def __init__(self, level: int = 6):
+        # wbits=16+MAX_WBITS writes a gzip header and trailer
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class BrotliCompressor:
+    def __init__(self, quality: int = 4):
+        self._obj = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data) + self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class ZstdCompressor:
+    def __init__(self, level: int = 3):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+def available_encodings() -> Dict[str, type]:
+    """Supported encodings in server preference order"""
+    encodings = {}
+    if zstandard is not None:
+        encodings["zstd"] = ZstdCompressor
+    if brotli is not None:
+        encodings["br"] = BrotliCompressor
+    encodings["gzip"] = GzipCompressor
+    return encodings
+
+
+def negotiate_encoding(accept_encoding: str, supported: List[str]) -> Optional[str]:
+    """
+    Pick an encoding from an Accept-Encoding header
+
+    The client's q-values win; ties go to the earlier entry in `supported`.
+    Returns None if nothing acceptable is supported (send identity).
+    """
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in supported:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class CompressionMiddleware:
+    """Compress HTTP responses using the best encoding the client accepts"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = available_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            accept = Headers(scope=scope).get("Accept-Encoding", "")
+            encoding = negotiate_encoding(accept, list(self.encodings))
+            # Runs even without an acceptable encoding, so identity responses
+            # still carry Vary: Accept-Encoding like their compressed variants
+            responder = CompressionResponder(self.app, self.minimum_size,
+                                             encoding, self.encodings.get(encoding))
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+class CompressionResponder:
+    """Compresses a single response; see starlette.middleware.gzip for the pattern"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int, encoding: Optional[str],
+                 compressor_class: Optional[type]):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encoding = encoding
+        self.compressor_class = compressor_class
+        self.compressor = None
+        self.initial_message: Message = {}
+        self.started = False
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Hold the headers until the first body chunk decides how to send them
+            self.initial_message = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            status = message["status"]
+            negotiable = (
+                "content-encoding" not in headers
+                and status >= 200
+                and status != 204
+                # A 304 has no body, but must carry the Vary of the 200 it validates
+                and (status == 304 or content_type.startswith(COMPRESSIBLE_TYPES))
+            )
+            if negotiable:
+                # The body depends on Accept-Encoding even when sent uncompressed
+                MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+            self.passthrough = not negotiable or status == 304 or self.encoding is None
+            return
+
+        if message_type != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.passthrough:
+            if not self.started:
+                self.started = True
+                await self.send(self.initial_message)
+            await self.send(message)
+            return
+
+        if not self.started:
+            self.started = True
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            if not more_body and len(body) < self.minimum_size:
+                # Not worth the CPU for small payloads
+                self.passthrough = True
+                await self.send(self.initial_message)
+                await self.send(message)
+                return
+
+            self.compressor = self.compressor_class()
+            headers["Content-Encoding"] = self.encoding
+            # A strong ETag names exact bytes, which no longer match once encoded
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = "W/" + etag
+            if more_body:
+                # Streaming: total length is unknown once compressed
+                del headers["Content-Length"]
+                message["body"] = self.compressor.compress(body)
+            else:
+                body = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(body))
+                message["body"] = body
+            await self.send(self.initial_message)
+            await self.send(message)
+            return
+
+        # Remaining chunks of a streamed response
+        chunk = self.compressor.compress(body) if body else b""
+        if not more_body:
+            chunk += self.compressor.finish()
+        message["body"] = chunk
+        await self.send(message)
@@ -3,14 +3,34 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, field_validator
 from typing import Optional, Literal
+import gc
+import os
+import signal
+import sys
+import traceback
 import uuid
 from datetime import date, time
 import json
 from datetime import datetime
+from caching import CacheMiddleware, ResponseCache
+from compression import CompressionMiddleware
+
+# Optional JSONL file that every accepted submission is appended to
+# This is the input format of the replay tool (replay.py)
+SUBMISSION_LOG = os.environ.get("SUBMISSION_LOG")
 
 # Initialize FastAPI application with metadata
 app = FastAPI(title="Chained Form API", version="1.0.0")
 
+# Read-heavy GET endpoints served from the response cache with ETag revalidation
+# Add listing/export/stats paths here as they are introduced
+CACHEABLE_PATHS = {"/openapi.json"}
+response_cache = ResponseCache()
+
+# Middleware added first runs innermost: the cache sits inside CORS so cached
+# responses never carry another origin's CORS headers
+app.add_middleware(CacheMiddleware, cache=response_cache, paths=CACHEABLE_PATHS)
+
 # Enable CORS for React frontend
 app.add_middleware(
     CORSMiddleware,
@@ -20,6 +40,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress responses over 1 KiB with zstd/brotli/gzip as negotiated
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
 # Define the data model for form submissions using Pydantic
 # This ensures data validation and automatic type conversion
 class FormSubmission(BaseModel):
@@ -164,6 +187,40 @@ class SubmitResponse(BaseModel):
     status: str  # Success status
     id: str      # Unique submission ID
 
+def process_submission(form_data: FormSubmission, log: bool = True) -> dict:
+    """
+    Run a parsed submission through the validation and post-processing pipeline
+    
+    Shared by the /api/submit endpoint and the replay tool (replay.py) so that
+    re-fed historical submissions go through exactly the same path.
+    log=False skips the SUBMISSION_LOG append, so replaying that log does not
+    write its records back into it.
+    Raises ValueError if the chained form logic is not satisfied.
+    """
+    # Step 1: Validate the form logic using our custom validation
+    form_data.validate_form_logic()
+    
+    # Step 2: Generate a unique identifier for this submission
+    submission_id = str(uuid.uuid4())
+    
+    # Step 3: Log the submission data
+    submission_data = {
+        "id": submission_id,
+        "timestamp": datetime.now().isoformat(),
+        "form_data": form_data.model_dump(mode="json")
+    }
+    
+    print(f"Form submission received: {submission_data}")
+    if log and SUBMISSION_LOG:
+        # One short O_APPEND write per line, so forked workers can share the file
+        with open(SUBMISSION_LOG, "a", encoding="utf-8") as f:
+            f.write(json.dumps(submission_data) + "\n")
+    
+    # Step 4: Cached read responses may now be out of date
+    response_cache.invalidate()
+    
+    return submission_data
+
 # API endpoint to handle form submissions
 @app.post("/api/submit", response_model=SubmitResponse)
 async def submit_form(form_data: FormSubmission):
@@ -176,23 +233,10 @@ async def submit_form(form_data: FormSubmission):
     3. Returns a success response with the submission ID
     """
     try:
-        # Step 1: Validate the form logic using our custom validation
-        form_data.validate_form_logic()
-        
-        # Step 2: Generate a unique identifier for this submission
-        submission_id = str(uuid.uuid4())
+        submission_data = process_submission(form_data)
         
-        # Step 3: Log the submission data
-        submission_data = {
-            "id": submission_id,
-            "timestamp": datetime.now().isoformat(),
-            "form_data": form_data.model_dump()
-        }
-        
-        print(f"Form submission received: {submission_data}")
-        
-        # Step 4: Return success response
-        return SubmitResponse(status="ok", id=submission_id)
+        # Return success response
+        return SubmitResponse(status="ok", id=submission_data["id"])
     
     except ValueError as e:
         # Handle validation errors (422 Unprocessable Entity)
@@ -208,9 +252,101 @@ async def root():
     """Simple health check endpoint to verify API is running"""
     return {"message": "Chained Form API is running"}
 
-if __name__ == "__main__":
+def serve(host: str = "0.0.0.0", port: int = 8001, workers: int = 1):
+    """
+    Serve the app, optionally with several preloaded worker processes
+    
+    With workers > 1 the app (FastAPI, Pydantic models, routes) is imported
+    and the listening socket bound once in this process, then workers are
+    forked from it. Workers share those pages copy-on-write instead of each
+    re-importing everything, which cuts cold-start time and per-worker RSS.
+    Platforms without fork (Windows) fall back to a single process.
+    """
+    # uvicorn is only needed when actually serving, not for imports of this module
     import uvicorn
-    # Start the FastAPI server with uvicorn
+    
+    if workers <= 1 or not hasattr(os, "fork"):
+        uvicorn.run(app, host=host, port=port)
+        return
+    
+    config = uvicorn.Config(app, host=host, port=port)
+    # Load the ASGI stack and protocol modules before forking so they are shared
+    config.load()
+    sock = config.bind_socket()
+    
+    # Move everything allocated so far out of the GC's reach; otherwise the
+    # first collection in each worker touches (and copies) every shared page
+    gc.freeze()
+    
+    children = []
+    stopping = False
+    
+    def stop_workers(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for child in children:
+            try:
+                os.kill(child, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+    
+    # Installed before forking so a signal mid-fork can't orphan started workers
+    signal.signal(signal.SIGTERM, stop_workers)
+    signal.signal(signal.SIGINT, stop_workers)
+    
+    for _ in range(workers):
+        if stopping:
+            break
+        pid = os.fork()
+        if pid == 0:
+            # Worker: serve on the inherited socket until told to stop
+            # Never return into the parent's code path, whatever happens here
+            exit_code = 1
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.default_int_handler)
+                server = uvicorn.Server(config)
+                server.run(sockets=[sock])
+                # Same exit code uvicorn.run uses when startup fails
+                exit_code = 0 if server.started else 3
+            except SystemExit as e:
+                exit_code = e.code if isinstance(e.code, int) else 1
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                os._exit(exit_code)
+        children.append(pid)
+    
+    print(f"Started {len(children)} preloaded workers: {children}")
+    
+    # Wait for every worker; if one dies abnormally, stop the rest and fail
+    failed = False
+    remaining = set(children)
+    while remaining:
+        pid, status = os.waitpid(-1, 0)
+        if pid not in remaining:
+            continue
+        remaining.discard(pid)
+        exit_code = os.waitstatus_to_exitcode(status)
+        if exit_code != 0:
+            print(f"Worker {pid} exited with code {exit_code}")
+            failed = True
+            stop_workers(None, None)
+    sock.close()
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Chained Form API server")
     # host="0.0.0.0" allows connections from any IP address
     # port=8001 to avoid potential conflicts
-    uvicorn.run(app, host="0.0.0.0", port=8001)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", 1)),
+                        help="Number of preloaded worker processes (forked after import)")
+    args = parser.parse_args()
+    
+    # Start the FastAPI server with uvicorn
+    serve(args.host, args.port, args.workers)
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Replay / backfill tool for historical form submissions
+
+Re-feeds stored submissions through the same pipeline as POST /api/submit,
+either in-process (validation + post-processing from main.py) or over HTTP
+against a running server, at a target rate with bounded concurrency.
+Progress is checkpointed so an interrupted replay can be resumed.
+
+Usage:
+    python replay.py submissions.jsonl --rate 50 --concurrency 8
+    python replay.py submissions.jsonl --url http://localhost:8001 --checkpoint replay.ckpt
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Iterator, Optional, Tuple
+
+# Outcome labels for a single replayed submission
+ACCEPTED = "accepted"  # Pipeline returned a submission ID
+REJECTED = "rejected"  # Validation error (422) - retrying would not help
+FAILED = "failed"      # Transport or server error
+
+
+def load_submissions(path: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """
+    Yield (index, payload, error) triples from a JSONL dump
+
+    Each line is either a logged submission record ({"id", "timestamp",
+    "form_data"}, as written to SUBMISSION_LOG by main.py) or a raw
+    /api/submit payload. Lines that are not a JSON object yield
+    (index, None, error) instead of aborting the whole dump. Blank lines are
+    skipped but still count towards the index so checkpoints stay stable.
+    Use "-" to read from stdin.
+    """
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for index, line in enumerate(stream):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield index, None, f"Malformed JSON: {e}"
+                continue
+            # Unwrap logged records so only the form fields are re-submitted
+            if isinstance(record, dict) and "form_data" in record:
+                record = record["form_data"]
+            if not isinstance(record, dict):
+                yield index, None, "Expected a JSON object"
+                continue
+            yield index, record, None
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+class RateLimiter:
+    """Paces sends to a target rate (records per second)"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_slot = time.monotonic()
+
+    async def acquire(self):
+        """Wait for the next send slot"""
+        now = time.monotonic()
+        if self.next_slot > now:
+            await asyncio.sleep(self.next_slot - now)
+        # Never bank unused slots - a slow target must not cause a burst later
+        self.next_slot = max(self.next_slot, now) + self.interval
+
+
+class Checkpoint:
+    """
+    Tracks how many leading records of the input have been fully handled
+
+    Records complete out of order when sent concurrently, so only the
+    contiguous prefix is persisted; on resume everything before
+    `next_index` is skipped and anything after it is replayed again.
+    """
+
+    def __init__(self, path: Optional[str], save_every: int = 100):
+        self.path = path
+        self.save_every = save_every
+        self.next_index = 0
+        self._done = set()
+        self._since_save = 0
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.next_index = json.load(f).get("next_index", 0)
+
+    def mark_done(self, index: int):
+        """Record a finished record and advance the contiguous prefix"""
+        self._done.add(index)
+        while self.next_index in self._done:
+            self._done.discard(self.next_index)
+            self.next_index += 1
+        self._since_save += 1
+        if self._since_save >= self.save_every:
+            self.save()
+
+    def save(self):
+        """Persist progress atomically so a crash never leaves a torn file"""
+        self._since_save = 0
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"next_index": self.next_index}, f)
+        os.replace(tmp_path, self.path)
+
+
+class InProcessTarget:
+    """Sends submissions through main.py's validation and processing path"""
+
+    def __init__(self):
+        # Imported lazily so HTTP mode does not need the server's dependencies
+        from main import FormSubmission, process_submission
+        self._model = FormSubmission
+        self._process = process_submission
+
+    async def send(self, payload: dict) -> Tuple[str, str]:
+        try:
+            # Replayed records are history already - don't append them to SUBMISSION_LOG again
+            submission = self._process(self._model(**payload), log=False)
+        except ValueError as e:
+            # Pydantic's ValidationError is a ValueError too
+            return REJECTED, str(e)
+        except Exception as e:
+            return FAILED, str(e)
+        return ACCEPTED, submission["id"]
+
+    async def close(self):
+        pass
+
+
+class HttpTarget:
+    """Posts submissions to a running server using a pooled async client"""
+
+    def __init__(self, base_url: str, concurrency: int, timeout: float = 10.0):
+        import httpx
+        self._httpx = httpx
+        # Size the pool to the concurrency limit so connections are reused
+        limits = httpx.Limits(max_connections=concurrency,
+                              max_keepalive_connections=concurrency)
+        self._client = httpx.AsyncClient(base_url=base_url, limits=limits,
+                                         timeout=timeout)
+
+    async def send(self, payload: dict) -> Tuple[str, str]:
+        try:
+            response = await self._client.post("/api/submit", json=payload)
+        except self._httpx.HTTPError as e:
+            return FAILED, str(e)
+        if response.status_code == 200:
+            try:
+                return ACCEPTED, response.json()["id"]
+            except (ValueError, KeyError, TypeError):
+                return FAILED, f"Unexpected response body: {response.text}"
+        if response.status_code == 422:
+            return REJECTED, response.text
+        return FAILED, f"HTTP {response.status_code}: {response.text}"
+
+    async def close(self):
+        await self._client.aclose()
+
+
+class ReplayStats:
+    """Counters and timing used for throughput and lag reporting"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.started = time.monotonic()
+        self.sent = 0
+        self.counts = {ACCEPTED: 0, REJECTED: 0, FAILED: 0}
+        self.max_lag = 0.0
+
+    def record(self, outcome: str):
+        self.counts[outcome] += 1
+        self.max_lag = max(self.max_lag, self.lag)
+
+    @property
+    def completed(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def throughput(self) -> float:
+        """Completed records per second since the replay started"""
+        return self.completed / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def lag(self) -> float:
+        """Seconds the replay is behind the target-rate schedule"""
+        if self.rate <= 0:
+            return 0.0
+        return max(0.0, self.elapsed - self.completed / self.rate)
+
+    def summary(self) -> str:
+        return (f"completed={self.completed} accepted={self.counts[ACCEPTED]} "
+                f"rejected={self.counts[REJECTED]} failed={self.counts[FAILED]} "
+                f"in_flight={self.sent - self.completed} "
+                f"throughput={self.throughput:.1f}/s lag={self.lag:.2f}s")
+
+
+async def replay(path: str, target, rate: float = 0.0, concurrency: int = 8,
+                 checkpoint: Optional[Checkpoint] = None,
+                 report_interval: float = 5.0, errors=sys.stderr) -> ReplayStats:
+    """
+    Replay every submission in `path` through `target`
+
+    rate <= 0 disables pacing (as fast as the concurrency limit allows).
+    Rejected and failed records are written to `errors`. Accepted and
+    rejected records count as handled for checkpointing; failed ones
+    (transport errors, 5xx) do not, so the checkpoint stops at the first
+    failure and a resume re-sends it.
+    """
+    checkpoint = checkpoint or Checkpoint(None)
+    limiter = RateLimiter(rate)
+    stats = ReplayStats(rate)
+    slots = asyncio.Semaphore(concurrency)
+    tasks = set()
+    last_index = -1
+
+    def finish(index: int, outcome: str, detail: str):
+        stats.record(outcome)
+        if outcome != ACCEPTED:
+            print(json.dumps({"index": index, "outcome": outcome,
+                              "detail": detail}), file=errors)
+        if outcome != FAILED:
+            checkpoint.mark_done(index)
+
+    async def send_one(index: int, payload: dict):
+        try:
+            finish(index, *await target.send(payload))
+        finally:
+            slots.release()
+
+    async def report():
+        while True:
+            await asyncio.sleep(report_interval)
+            print(f"[replay] {stats.summary()}", flush=True)
+
+    reporter = asyncio.create_task(report()) if report_interval > 0 else None
+    try:
+        for index, payload, error in load_submissions(path):
+            if index < checkpoint.next_index:
+                continue
+            # Blank lines are never sent but must not stall the checkpoint
+            for skipped in range(max(last_index + 1, checkpoint.next_index), index):
+                checkpoint.mark_done(skipped)
+            last_index = index
+            if error:
+                # Unparseable lines are rejected without being sent
+                stats.sent += 1
+                finish(index, REJECTED, error)
+                continue
+            # Take a concurrency slot before pacing so queued sends don't pile up
+            await slots.acquire()
+            await limiter.acquire()
+            stats.sent += 1
+            task = asyncio.create_task(send_one(index, payload))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+    finally:
+        if reporter:
+            reporter.cancel()
+        checkpoint.save()
+        await target.close()
+
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Replay historical form submissions through the /api/submit pipeline")
+    parser.add_argument("input", help="JSONL dump of submissions ('-' for stdin)")
+    parser.add_argument("--url", help="Replay over HTTP against this server "
+                                      "(default: in-process pipeline)")
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="Target records per second (0 = unlimited)")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="Maximum submissions in flight")
+    parser.add_argument("--checkpoint", help="Progress file used to resume an interrupted replay")
+    parser.add_argument("--checkpoint-every", type=int, default=100,
+                        help="Save the checkpoint after this many records")
+    parser.add_argument("--report-interval", type=float, default=5.0,
+                        help="Seconds between progress reports (0 = final report only)")
+    args = parser.parse_args(argv)
+
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+
+    # A server logging into the file being replayed would feed it forever
+    submission_log = os.environ.get("SUBMISSION_LOG")
+    if (args.url and submission_log and args.input != "-"
+            and os.path.realpath(submission_log) == os.path.realpath(args.input)):
+        parser.error("input is the SUBMISSION_LOG file; replaying it over HTTP "
+                     "would append every record back into it")
+
+    checkpoint = Checkpoint(args.checkpoint, save_every=args.checkpoint_every)
+    if checkpoint.next_index:
+        print(f"[replay] resuming from record {checkpoint.next_index}")
+
+    target = (HttpTarget(args.url, args.concurrency) if args.url
+              else InProcessTarget())
+    stats = asyncio.run(replay(args.input, target, rate=args.rate,
+                               concurrency=args.concurrency, checkpoint=checkpoint,
+                               report_interval=args.report_interval))
+    print(f"[replay] done: {stats.summary()} elapsed={stats.elapsed:.2f}s "
+          f"max_lag={stats.max_lag:.2f}s")
+    return 0 if stats.counts[FAILED] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Startup profile for the Chained Form API
+
+Measures, in fresh interpreters, how long importing main.py takes and how
+much memory it costs, and optionally compares per-worker memory of a
+multi-worker deployment in preload-then-fork mode (python main.py --workers N)
+against uvicorn's spawn mode (uvicorn main:app --workers N).
+
+Usage:
+    python startup_profile.py
+    python startup_profile.py --runs 10 --workers 4
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+from typing import Dict, List
+
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Run in the child interpreter: time the import and report resident memory
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+rss_kb = 0
+with open("/proc/self/status") as f:
+    for line in f:
+        if line.startswith("VmRSS:"):
+            rss_kb = int(line.split()[1])
+print(f"{elapsed} {rss_kb}")
+"""
+
+
+def measure_import(runs: int) -> dict:
+    """Import main.py in `runs` fresh interpreters and summarize time, RSS and hot packages"""
+    times, rss = [], []
+    package_us = defaultdict(list)
+
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", IMPORT_SNIPPET],
+                                cwd=SERVER_DIR, capture_output=True, text=True, check=True)
+        elapsed, rss_kb = result.stdout.split()
+        times.append(float(elapsed))
+        rss.append(int(rss_kb))
+
+        # -X importtime lines: "import time: self [us] | cumulative | imported package"
+        totals = defaultdict(int)
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, _, name = line[len("import time:"):].split("|")
+            totals[name.strip().split(".")[0]] += int(self_us)
+        for package, us in totals.items():
+            package_us[package].append(us)
+
+    top = sorted(((statistics.median(v), k) for k, v in package_us.items()), reverse=True)
+    return {
+        "import_s": statistics.median(times),
+        "rss_kb": statistics.median(rss),
+        "top_packages": [(name, us / 1000) for us, name in top[:10]],
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def child_pids(pid: int) -> List[int]:
+    """Direct children of `pid`, excluding multiprocessing helper processes"""
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            with open(f"/proc/{entry}/cmdline") as f:
+                cmdline = f.read()
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid and "resource_tracker" not in cmdline:
+            children.append(int(entry))
+    return children
+
+
+def memory_kb(pid: int) -> Dict[str, int]:
+    """RSS, PSS and USS (private pages) of a process from /proc/<pid>/smaps_rollup"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "uss": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def measure_workers(mode: str, workers: int, requests: int = 50, timeout: float = 60.0) -> dict:
+    """Start a multi-worker server, warm it up, and report ready time and per-worker memory"""
+    port = free_port()
+    if mode == "preload":
+        command = [sys.executable, "main.py", "--host", "127.0.0.1",
+                   "--port", str(port), "--workers", str(workers)]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+                   "--port", str(port), "--workers", str(workers)]
+
+    url = f"http://127.0.0.1:{port}/"
+    started = time.perf_counter()
+    server = subprocess.Popen(command, cwd=SERVER_DIR,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        # Ready once every worker is up and the socket answers
+        while True:
+            if time.perf_counter() - started > timeout:
+                raise RuntimeError(f"{mode} server did not start within {timeout}s")
+            if server.poll() is not None:
+                raise RuntimeError(f"{mode} server exited with code {server.returncode}")
+            if len(child_pids(server.pid)) >= workers:
+                try:
+                    urllib.request.urlopen(url, timeout=1).read()
+                    break
+                except OSError:
+                    pass
+            time.sleep(0.05)
+        ready_s = time.perf_counter() - started
+
+        # Serve some traffic so the numbers reflect a warmed-up worker
+        for _ in range(requests):
+            urllib.request.urlopen(url, timeout=5).read()
+
+        per_worker = [memory_kb(pid) for pid in child_pids(server.pid)]
+        return {
+            "ready_s": ready_s,
+            "workers": len(per_worker),
+            **{key: statistics.mean(m[key] for m in per_worker) for key in ("rss", "pss", "uss")},
+            "total_pss": sum(m["pss"] for m in per_worker) + memory_kb(server.pid)["pss"],
+        }
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile Chained Form API startup cost")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh imports to take the median of")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Also compare preload vs spawn serving with this many workers")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        parser.error("startup profiling reads /proc and requires Linux")
+
+    imports = measure_import(args.runs)
+    print(f"Import of main.py (median of {args.runs} cold runs)")
+    print(f"  time: {imports['import_s'] * 1000:.0f} ms")
+    print(f"  RSS:  {imports['rss_kb'] / 1024:.1f} MiB")
+    print("  slowest top-level packages (self time):")
+    for name, ms in imports["top_packages"]:
+        print(f"    {name:<24} {ms:8.1f} ms")
+
+    if args.workers:
+        print(f"\nServing with {args.workers} workers (per-worker averages, after warm-up)")
+        print(f"  {'mode':<8} {'ready':>8} {'RSS':>10} {'PSS':>10} {'USS':>10} {'total PSS':>11}")
+        for mode in ("spawn", "preload"):
+            r = measure_workers(mode, args.workers)
+            print(f"  {mode:<8} {r['ready_s']:7.2f}s {r['rss'] / 1024:8.1f}Mi "
+                  f"{r['pss'] / 1024:8.1f}Mi {r['uss'] / 1024:8.1f}Mi {r['total_pss'] / 1024:9.1f}Mi")
+
+
+if __name__ == "__main__":
+    main()
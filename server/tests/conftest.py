@@ -0,0 +1,10 @@
+"""
+Shared pytest setup for the server tests
+Puts server/ on sys.path so the tests can import main, replay, caching, etc.
+no matter which directory pytest is started from
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
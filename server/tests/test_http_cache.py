@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Test script for response compression and HTTP caching
+Uses FastAPI's TestClient, so no server needs to be running
+"""
+
+import gzip
+
+import brotli
+import zstandard
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from caching import CacheMiddleware, ResponseCache
+from compression import CompressionMiddleware, negotiate_encoding
+from main import app, response_cache
+
+LARGE_PAYLOAD = {"items": [{"id": i, "name": f"submission {i}"} for i in range(200)]}
+
+VALID_SUBMISSION = {
+    "mode": "Basic",
+    "topic": "quick note",
+    "choose_time": "14:30",
+    "urgency": "High"
+}
+
+
+def make_app(cache=None):
+    """Small app with a counted endpoint so cache hits are observable"""
+    test_app = FastAPI()
+    test_app.state.calls = 0
+
+    @test_app.get("/stats")
+    async def stats():
+        test_app.state.calls += 1
+        return LARGE_PAYLOAD
+
+    @test_app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @test_app.get("/export")
+    async def export():
+        lines = (f'{{"id": {i}}}\n' for i in range(500))
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+
+    if cache is not None:
+        test_app.add_middleware(CacheMiddleware, cache=cache, paths={"/stats", "/export"})
+    test_app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    return test_app
+
+
+class TestNegotiation:
+    """Test cases for Accept-Encoding negotiation"""
+
+    def test_server_preference_on_tie(self):
+        """Test that equal q-values pick the server's preferred encoding"""
+        assert negotiate_encoding("gzip, br, zstd", ["zstd", "br", "gzip"]) == "zstd"
+
+    def test_client_q_values_win(self):
+        """Test that the client's q-values override server preference"""
+        assert negotiate_encoding("zstd;q=0.5, gzip", ["zstd", "br", "gzip"]) == "gzip"
+
+    def test_nothing_acceptable(self):
+        """Test that identity is used when no supported encoding is accepted"""
+        assert negotiate_encoding("identity, zstd;q=0", ["zstd", "gzip"]) is None
+
+
+class TestCompression:
+    """Test cases for compressed responses"""
+
+    def test_each_encoding_round_trips(self):
+        """Test gzip, brotli and zstd responses decode to the original JSON"""
+        client = TestClient(make_app())
+        decoders = {
+            "gzip": gzip.decompress,
+            "br": brotli.decompress,
+            "zstd": lambda data: zstandard.ZstdDecompressor().decompressobj().decompress(data),
+        }
+        plain = client.get("/stats", headers={"Accept-Encoding": "identity"}).content
+        for encoding, decode in decoders.items():
+            # Stream raw bytes so the client doesn't decode for us
+            with client.stream("GET", "/stats", headers={"Accept-Encoding": encoding}) as response:
+                raw = b"".join(response.iter_raw())
+            assert response.headers["content-encoding"] == encoding
+            assert "Accept-Encoding" in response.headers["vary"]
+            assert len(raw) < len(plain)
+            assert decode(raw) == plain
+
+    def test_small_response_not_compressed(self):
+        """Test that responses below the size threshold are sent as-is"""
+        client = TestClient(make_app())
+        response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.json() == {"ok": True}
+
+    def test_streaming_response_compressed(self):
+        """Test that streamed responses are compressed chunk by chunk"""
+        client = TestClient(make_app())
+        response = client.get("/export", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert response.text.count("\n") == 500
+
+
+class TestResponseCache:
+    """Test cases for ETag revalidation and server-side caching"""
+
+    def test_etag_and_not_modified(self):
+        """Test that a matching If-None-Match gets a 304 without recomputing"""
+        test_app = make_app(ResponseCache())
+        client = TestClient(test_app)
+
+        first = client.get("/stats")
+        etag = first.headers["etag"]
+        assert first.headers["cache-control"] == "no-cache"
+
+        second = client.get("/stats", headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.content == b""
+        assert test_app.state.calls == 1
+
+    def test_not_modified_keeps_vary(self):
+        """Test that 304s carry the same Vary as the 200, with or without compression"""
+        client = TestClient(make_app(ResponseCache()))
+
+        for accept in ("gzip", "identity"):
+            first = client.get("/stats", headers={"Accept-Encoding": accept})
+            second = client.get("/stats", headers={"Accept-Encoding": accept,
+                                                   "If-None-Match": first.headers["etag"]})
+            assert "Accept-Encoding" in first.headers["vary"]
+            assert second.status_code == 304
+            assert "Accept-Encoding" in second.headers["vary"]
+
+    def test_etag_independent_of_encoding(self):
+        """Test that compressed and identity responses share one validator"""
+        client = TestClient(make_app(ResponseCache()))
+
+        plain = client.get("/stats", headers={"Accept-Encoding": "identity"})
+        compressed = client.get("/stats", headers={"Accept-Encoding": "gzip"})
+
+        assert plain.headers["etag"] == compressed.headers["etag"]
+
+    def test_invalidate_recomputes(self):
+        """Test that invalidation makes the next request hit the endpoint again"""
+        cache = ResponseCache()
+        test_app = make_app(cache)
+        client = TestClient(test_app)
+
+        client.get("/stats")
+        client.get("/stats")
+        assert test_app.state.calls == 1
+
+        cache.invalidate()
+        client.get("/stats")
+        assert test_app.state.calls == 2
+
+    def test_streaming_response_not_cached(self):
+        """Test that streamed responses pass through without being stored"""
+        cache = ResponseCache()
+        client = TestClient(make_app(cache))
+
+        response = client.get("/export")
+
+        assert response.text.count("\n") == 500
+        assert len(cache) == 0
+
+    def test_submission_invalidates_app_cache(self, monkeypatch):
+        """Test that a new submission makes the API rebuild cached responses"""
+        calls = []
+        openapi = app.openapi
+
+        def counted_openapi():
+            calls.append(1)
+            return openapi()
+
+        monkeypatch.setattr(app, "openapi", counted_openapi)
+        # Start from an empty cache regardless of earlier tests
+        response_cache.invalidate()
+        client = TestClient(app)
+
+        etag = client.get("/openapi.json").headers["etag"]
+        assert client.get("/openapi.json", headers={"If-None-Match": etag}).status_code == 304
+        assert len(calls) == 1
+
+        assert client.post("/api/submit", json=VALID_SUBMISSION).status_code == 200
+
+        response = client.get("/openapi.json", headers={"If-None-Match": etag})
+        assert len(calls) == 2
+        # Same content, so the rebuilt entry still revalidates
+        assert response.status_code == 304
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Test script for the submission replay tool
+Runs replays in-process, so no server needs to be running
+"""
+
+import asyncio
+import io
+import json
+
+import httpx
+
+import main
+from replay import Checkpoint, HttpTarget, InProcessTarget, load_submissions, replay
+
+VALID_DATE_PATH = {
+    "mode": "Advanced",
+    "category": "Schedule",
+    "choose_date": "2024-01-15",
+    "budget": 500
+}
+
+VALID_TIME_PATH = {
+    "mode": "Basic",
+    "topic": "quick note",
+    "choose_time": "14:30",
+    "urgency": "High"
+}
+
+INVALID_TIME_PATH = {
+    "mode": "Basic",
+    "topic": "quick note",
+    "urgency": "High"
+}
+
+
+def write_dump(path, records):
+    """Write records as JSONL; None becomes a blank line"""
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write("" if record is None else json.dumps(record))
+            f.write("\n")
+    return str(path)
+
+
+class TestLoadSubmissions:
+    """Test cases for reading JSONL dumps"""
+
+    def test_unwraps_logged_records(self, tmp_path):
+        """Test that logged {id, timestamp, form_data} records yield only the form data"""
+        logged = {"id": "abc", "timestamp": "2024-01-15T10:00:00", "form_data": VALID_DATE_PATH}
+        path = write_dump(tmp_path / "dump.jsonl", [logged, VALID_TIME_PATH])
+
+        assert list(load_submissions(path)) == [(0, VALID_DATE_PATH, None),
+                                                (1, VALID_TIME_PATH, None)]
+
+    def test_blank_lines_keep_indices(self, tmp_path):
+        """Test that blank lines are skipped without shifting record indices"""
+        path = write_dump(tmp_path / "dump.jsonl", [VALID_DATE_PATH, None, VALID_TIME_PATH])
+
+        assert [index for index, _, _ in load_submissions(path)] == [0, 2]
+
+    def test_malformed_lines_yield_errors(self, tmp_path):
+        """Test that invalid JSON and non-object lines are reported, not raised"""
+        path = tmp_path / "dump.jsonl"
+        path.write_text('{"mode": "Basic"\n[1, 2]\n', encoding="utf-8")
+
+        records = list(load_submissions(str(path)))
+
+        assert [(index, payload) for index, payload, _ in records] == [(0, None), (1, None)]
+        assert all(error for _, _, error in records)
+
+    def test_reads_submission_log(self, tmp_path, monkeypatch):
+        """Test that lines written by the API's SUBMISSION_LOG load back as payloads"""
+        log_path = str(tmp_path / "submissions.jsonl")
+        monkeypatch.setattr(main, "SUBMISSION_LOG", log_path)
+
+        main.process_submission(main.FormSubmission(**VALID_DATE_PATH))
+
+        [(index, payload, error)] = list(load_submissions(log_path))
+        assert error is None
+        assert main.FormSubmission(**payload) == main.FormSubmission(**VALID_DATE_PATH)
+
+
+class TestCheckpoint:
+    """Test cases for resumable progress tracking"""
+
+    def test_out_of_order_completion(self):
+        """Test that only the contiguous prefix of finished records is counted"""
+        checkpoint = Checkpoint(None)
+        checkpoint.mark_done(1)
+        assert checkpoint.next_index == 0
+
+        checkpoint.mark_done(0)
+        assert checkpoint.next_index == 2
+
+    def test_save_and_reload(self, tmp_path):
+        """Test that a saved checkpoint is picked up by a new instance"""
+        path = str(tmp_path / "replay.ckpt")
+        checkpoint = Checkpoint(path)
+        checkpoint.mark_done(0)
+        checkpoint.save()
+
+        assert Checkpoint(path).next_index == 1
+
+
+class TestReplay:
+    """Test cases for replaying through the in-process pipeline"""
+
+    def test_replay_counts_outcomes(self, tmp_path):
+        """Test that valid submissions are accepted and invalid ones rejected"""
+        path = write_dump(tmp_path / "dump.jsonl",
+                          [VALID_DATE_PATH, None, INVALID_TIME_PATH, VALID_TIME_PATH])
+        errors = io.StringIO()
+
+        stats = asyncio.run(replay(path, InProcessTarget(), concurrency=2,
+                                   report_interval=0, errors=errors))
+
+        assert stats.counts == {"accepted": 2, "rejected": 1, "failed": 0}
+        assert json.loads(errors.getvalue())["index"] == 2
+
+    def test_malformed_line_does_not_abort(self, tmp_path):
+        """Test that a bad line is rejected and the checkpoint still moves past it"""
+        path = tmp_path / "dump.jsonl"
+        path.write_text("not json\n" + json.dumps(VALID_TIME_PATH) + "\n", encoding="utf-8")
+        ckpt_path = str(tmp_path / "replay.ckpt")
+        errors = io.StringIO()
+
+        stats = asyncio.run(replay(str(path), InProcessTarget(), checkpoint=Checkpoint(ckpt_path),
+                                   report_interval=0, errors=errors))
+
+        assert stats.counts == {"accepted": 1, "rejected": 1, "failed": 0}
+        assert json.loads(errors.getvalue())["index"] == 0
+        assert Checkpoint(ckpt_path).next_index == 2
+
+    def test_resume_skips_completed_records(self, tmp_path):
+        """Test that a second run with the same checkpoint replays nothing"""
+        path = write_dump(tmp_path / "dump.jsonl", [VALID_DATE_PATH, None, VALID_TIME_PATH])
+        ckpt_path = str(tmp_path / "replay.ckpt")
+
+        first = asyncio.run(replay(path, InProcessTarget(), checkpoint=Checkpoint(ckpt_path),
+                                   report_interval=0))
+        second = asyncio.run(replay(path, InProcessTarget(), checkpoint=Checkpoint(ckpt_path),
+                                    report_interval=0))
+
+        assert first.completed == 2
+        assert second.completed == 0
+        assert Checkpoint(ckpt_path).next_index == 3
+
+    def test_in_process_replay_does_not_grow_submission_log(self, tmp_path, monkeypatch):
+        """Test that replaying the SUBMISSION_LOG in-process does not append to it"""
+        log_path = str(tmp_path / "submissions.jsonl")
+        monkeypatch.setattr(main, "SUBMISSION_LOG", log_path)
+        main.process_submission(main.FormSubmission(**VALID_TIME_PATH))
+
+        stats = asyncio.run(replay(log_path, InProcessTarget(), report_interval=0))
+
+        assert stats.counts["accepted"] == 1
+        with open(log_path, encoding="utf-8") as f:
+            assert len(f.readlines()) == 1
+
+    def test_rate_limit_paces_sends(self, tmp_path):
+        """Test that the target rate bounds throughput"""
+        path = write_dump(tmp_path / "dump.jsonl", [VALID_TIME_PATH] * 5)
+
+        stats = asyncio.run(replay(path, InProcessTarget(), rate=50, report_interval=0))
+
+        # 5 records at 50/s need at least 4 intervals of 20ms
+        assert stats.elapsed >= 0.08
+        assert stats.counts["accepted"] == 5
+
+
+class TestHttpTarget:
+    """Test cases for replaying over HTTP"""
+
+    def test_bad_success_body_is_failed(self):
+        """Test that a 200 without a JSON submission ID is reported, not raised"""
+        target = HttpTarget("http://testserver", concurrency=1)
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, text="OK"))
+        target._client = httpx.AsyncClient(base_url="http://testserver", transport=transport)
+
+        async def send():
+            try:
+                return await target.send(VALID_TIME_PATH)
+            finally:
+                await target.close()
+
+        outcome, detail = asyncio.run(send())
+        assert outcome == "failed"
+        assert "OK" in detail
+
+    def test_failed_records_hold_the_checkpoint(self, tmp_path):
+        """Test that a 503 keeps the checkpoint at the failed record for the next resume"""
+        path = write_dump(tmp_path / "dump.jsonl",
+                          [VALID_TIME_PATH, VALID_DATE_PATH, VALID_TIME_PATH])
+        ckpt_path = str(tmp_path / "replay.ckpt")
+
+        def respond(request):
+            # The Advanced-mode record hits an unavailable server
+            if json.loads(request.content)["mode"] == "Advanced":
+                return httpx.Response(503, text="Service Unavailable")
+            return httpx.Response(200, json={"status": "ok", "id": "abc"})
+
+        target = HttpTarget("http://testserver", concurrency=1)
+        target._client = httpx.AsyncClient(base_url="http://testserver",
+                                           transport=httpx.MockTransport(respond))
+
+        stats = asyncio.run(replay(path, target, concurrency=1, checkpoint=Checkpoint(ckpt_path),
+                                   report_interval=0, errors=io.StringIO()))
+
+        assert stats.counts == {"accepted": 2, "rejected": 0, "failed": 1}
+        assert Checkpoint(ckpt_path).next_index == 1